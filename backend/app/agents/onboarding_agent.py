@@ -15,6 +15,9 @@ class NxtWaveOnboardingAgent(agents.Agent):
         self.session_data = {}
         self.conversation_history = []
         self.room = None
+        self.session_id = None
+        # Optional SessionEventLog; set by the agent service before the session starts
+        self.event_log = None
 
     async def on_join(self, room: rtc.Room):
         """Called when the agent joins the room."""
@@ -43,6 +46,9 @@ class NxtWaveOnboardingAgent(agents.Agent):
 
     async def handle_frontend_message(self, message: str):
         """Handle messages received from the frontend via data channel."""
+        if self.event_log:
+            self.event_log.frontend_action(message)
+
         try:
             data = json.loads(message)
             action = data.get("action")
@@ -69,6 +75,8 @@ class NxtWaveOnboardingAgent(agents.Agent):
         """Advance to the next stage in the onboarding process."""
         if self.current_stage < 4:
             self.current_stage += 1
+            if self.event_log:
+                self.event_log.stage_change(self.current_stage)
 
             # Send stage change to frontend
             await self.send_data({
@@ -90,6 +98,8 @@ class NxtWaveOnboardingAgent(agents.Agent):
         """Set the current stage (for navigation)."""
         if 1 <= stage <= 4:
             self.current_stage = stage
+            if self.event_log:
+                self.event_log.stage_change(self.current_stage)
             await self.send_data({
                 "action": "set_stage",
                 "stage": self.current_stage
@@ -131,6 +141,9 @@ class NxtWaveOnboardingAgent(agents.Agent):
 
     async def send_data(self, payload: Dict[str, Any]):
         """Send data to the frontend via data channel."""
+        if self.event_log:
+            self.event_log.outbound(payload)
+
         if self.room:
             try:
                 # Find the data channel and send the message
@@ -145,6 +158,9 @@ class NxtWaveOnboardingAgent(agents.Agent):
 
     async def on_user_speech_completed(self, speech_text: str):
         """Called when the user finishes speaking."""
+        if self.event_log:
+            self.event_log.user_utterance(speech_text)
+
         if speech_text.strip():
             # Add to conversation history
             self.conversation_history.append({
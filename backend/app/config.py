@@ -1,6 +1,10 @@
 # backend/app/config.py
 from pydantic_settings import BaseSettings
 import os
+from typing import Optional
+
+# Absolute path of the /backend folder
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 class Settings(BaseSettings):
     # LiveKit settings
@@ -11,6 +15,15 @@ class Settings(BaseSettings):
     # Google Gemini API settings
     GOOGLE_API_KEY: str
 
+    # Session event logging (used for offline replay).
+    # Logs contain raw user utterances; disable or prune the directory as needed.
+    # A relative SESSION_LOG_DIR is resolved against the /backend folder.
+    SESSION_LOG_ENABLED: bool = True
+    SESSION_LOG_DIR: str = "session_logs"
+
+    # Token required by the /api/admin endpoints; they are disabled when unset
+    ADMIN_TOKEN: Optional[str] = None
+
     class Config:
         env_file = ".env"
         # This tells Pydantic to read from the .env file at the root of the /backend folder.
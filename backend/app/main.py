@@ -22,6 +22,10 @@ app.add_middleware(
 # Assuming your execution path is the root of /backend
 sys.path.append(os.path.abspath('app'))
 from config import settings
+from app.routers import admin
+
+# Admin endpoints (profiling); require the X-Admin-Token header
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 
 @app.post("/api/voice-session/start")
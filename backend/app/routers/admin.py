@@ -0,0 +1,139 @@
+# --- Admin API Endpoints ---
+# Operational endpoints for investigating a running worker.
+# Mounted under /api/admin; every request needs the X-Admin-Token header.
+# Example: POST /api/admin/profile/cpu
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from typing import Optional
+import os
+import secrets
+from app.config import settings
+from app.services.profiling_service import profile_cpu, profile_memory, ProfilerBusyError
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reject requests without a valid X-Admin-Token header.
+    Admin endpoints are disabled entirely when ADMIN_TOKEN is not configured.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    # Compare bytes: compare_digest rejects non-ASCII str, and headers arrive latin-1 decoded
+    if not x_admin_token or not secrets.compare_digest(
+        x_admin_token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8")
+    ):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+# Keep profiling windows bounded so a request can't pin a worker indefinitely
+MAX_PROFILE_DURATION = 120.0
+MIN_SAMPLE_INTERVAL = 0.001
+MAX_MEMORY_NFRAMES = 50
+MAX_MEMORY_LIMIT = 5000
+
+class CpuProfileRequest(BaseModel):
+    duration: float = 10.0
+    interval: float = 0.005  # Seconds between stack samples
+    session_id: Optional[str] = None  # Only keep samples from this session
+    pid: Optional[int] = None  # Worker process to profile
+    format: str = "json"  # "json" or "collapsed"
+
+class MemoryProfileRequest(BaseModel):
+    duration: float = 10.0
+    nframes: int = 25  # Stack depth recorded per allocation
+    limit: int = 500  # Maximum number of stacks to return
+    pid: Optional[int] = None  # Worker process to profile
+    format: str = "json"  # "json" or "collapsed"
+
+def _check_request(duration: float, pid: Optional[int], format: str):
+    if not 0 < duration <= MAX_PROFILE_DURATION:
+        raise HTTPException(
+            status_code=400,
+            detail=f"duration must be between 0 and {MAX_PROFILE_DURATION} seconds"
+        )
+    if format not in ("json", "collapsed"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'collapsed'")
+    # With several workers behind one port the caller can't pick a process, so
+    # report which one answered (421 Misdirected Request) and let the caller
+    # retry until it lands on the target
+    if pid is not None and pid != os.getpid():
+        raise HTTPException(
+            status_code=421,
+            detail={"reason": "wrong_worker", "pid": os.getpid(), "target_pid": pid}
+        )
+
+def _busy(e: ProfilerBusyError) -> HTTPException:
+    # Not retryable in a tight loop: the worker is already being profiled
+    return HTTPException(
+        status_code=409,
+        detail={"reason": "busy", "pid": os.getpid(), "message": str(e)}
+    )
+
+def _respond(result: dict, format: str):
+    if format == "collapsed":
+        return PlainTextResponse(result["collapsed"])
+    return result
+
+@router.get("/profile")
+async def get_profile_target():
+    """
+    Return the id of the worker process serving this request.
+    """
+    return {"pid": os.getpid()}
+
+@router.post("/profile/cpu")
+async def start_cpu_profile(request: CpuProfileRequest):
+    """
+    Run the sampling CPU profiler on this worker for a time window.
+
+    Samples taken inside NxtWaveOnboardingAgent handlers or agent_service tasks
+    are prefixed with "session:<id>". The response contains collapsed stacks
+    ready for flamegraph tools.
+    """
+    _check_request(request.duration, request.pid, request.format)
+    if request.interval < MIN_SAMPLE_INTERVAL:
+        raise HTTPException(
+            status_code=400,
+            detail=f"interval must be at least {MIN_SAMPLE_INTERVAL} seconds"
+        )
+
+    try:
+        result = await profile_cpu(request.duration, request.interval, request.session_id)
+    except ProfilerBusyError as e:
+        raise _busy(e)
+    except Exception as e:
+        print(f"Error running CPU profile: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to run CPU profile: {str(e)}"
+        )
+
+    return _respond(result, request.format)
+
+@router.post("/profile/memory")
+async def start_memory_profile(request: MemoryProfileRequest):
+    """
+    Trace allocations on this worker for a time window with tracemalloc.
+
+    Allocations are not tied to sessions; the response contains collapsed
+    stacks weighted by bytes still allocated at the end of the window.
+    """
+    _check_request(request.duration, request.pid, request.format)
+    if not 1 <= request.nframes <= MAX_MEMORY_NFRAMES:
+        raise HTTPException(status_code=400, detail=f"nframes must be between 1 and {MAX_MEMORY_NFRAMES}")
+    if not 1 <= request.limit <= MAX_MEMORY_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_MEMORY_LIMIT}")
+
+    try:
+        result = await profile_memory(request.duration, request.nframes, request.limit)
+    except ProfilerBusyError as e:
+        raise _busy(e)
+    except Exception as e:
+        print(f"Error running memory profile: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to run memory profile: {str(e)}"
+        )
+
+    return _respond(result, request.format)
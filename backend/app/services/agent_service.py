@@ -3,11 +3,13 @@
 # It uses the other services to get tokens and then launches the agent.
 # It will be responsible for creating an instance of your agent class.
 import asyncio
+import os
 import uuid
 from typing import Dict, Any
 from app.agents.onboarding_agent import NxtWaveOnboardingAgent
 from app.services.livekit_service import create_agent_token, cleanup_room
-from app.config import settings
+from app.services.session_log import SessionEventLog
+from app.config import settings, BACKEND_DIR
 
 # In-memory storage for active sessions (in production, use Redis or database)
 active_sessions: Dict[str, Dict[str, Any]] = {}
@@ -29,6 +31,14 @@ async def launch_agent_for_session(session_id: str, room_name: str) -> Dict[str,
 
         # Create agent instance
         agent = NxtWaveOnboardingAgent()
+        agent.session_id = session_id
+
+        # Record the session so it can be replayed offline
+        if settings.SESSION_LOG_ENABLED:
+            log_dir = os.path.join(BACKEND_DIR, settings.SESSION_LOG_DIR)
+            agent.event_log = SessionEventLog(
+                os.path.join(log_dir, f"{session_id}.sessionlog")
+            )
 
         # Store session info
         session_info = {
@@ -102,6 +112,14 @@ async def end_agent_session(session_id: str):
         session_info = active_sessions[session_id]
         room_name = session_info["room_name"]
 
+        # Flush the session's event log
+        agent = session_info["agent"]
+        if agent.event_log:
+            try:
+                await agent.event_log.close()
+            except Exception as e:
+                print(f"Error closing event log for session {session_id}: {e}")
+
         # Clean up LiveKit room
         await cleanup_room(room_name)
 
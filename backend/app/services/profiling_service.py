@@ -0,0 +1,226 @@
+# --- Profiling Service ---
+# On-demand profiling for the running worker process. Nothing here is active
+# until an admin request opens a profiling window, so there is no overhead
+# while profiling is off: no tracing hooks, no sampler thread, no tracemalloc.
+#
+# - CPU: a background thread samples the event loop thread's stack at a fixed
+#   interval (statistical profiling). Samples taken inside NxtWaveOnboardingAgent
+#   handlers or agent_service tasks are attributed to their session id.
+# - Memory: tracemalloc is started for the window and a snapshot of the
+#   allocations still alive at the end is taken.
+#
+# Both return collapsed stacks ("frame;frame;frame count" per line), which
+# flamegraph.pl, speedscope and inferno can read directly.
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+# Modules whose frames carry a session id we can attribute samples to
+AGENT_MODULE = "app.agents.onboarding_agent"
+AGENT_SERVICE_MODULE = "app.services.agent_service"
+
+# Only one profiling window may be open per process at a time
+_profile_lock = asyncio.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profiling window is already open in this process."""
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """Path relative to the longest matching sys.path entry, so names stay unique."""
+    best = ""
+    for entry in sys.path:
+        entry = os.path.abspath(entry or ".")
+        if len(entry) > len(best) and filename.startswith(entry + os.sep):
+            best = entry
+    return os.path.relpath(filename, best) if best else filename
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _frame_session_id(frame) -> Optional[str]:
+    """Return the session id a frame belongs to, if it is an agent or agent_service frame."""
+    module = frame.f_globals.get("__name__")
+    if module == AGENT_MODULE:
+        agent = frame.f_locals.get("self")
+        return getattr(agent, "session_id", None)
+    if module == AGENT_SERVICE_MODULE:
+        f_locals = frame.f_locals
+        session_id = f_locals.get("session_id")
+        if session_id is None and isinstance(f_locals.get("session_info"), dict):
+            session_id = f_locals["session_info"].get("session_id")
+        return session_id
+    return None
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005, session_id: Optional[str] = None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.session_id = session_id
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._sample(frame)
+            # Drop our reference so the sampled thread's frames can be freed
+            frame = None
+
+    def _sample(self, frame):
+        stack = []
+        session_id = None
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            if session_id is None:
+                session_id = _frame_session_id(frame)
+            frame = frame.f_back
+
+        self.samples += 1
+        if self.session_id is not None and session_id != self.session_id:
+            return
+
+        stack.reverse()
+        if session_id is not None:
+            stack.insert(0, f"session:{session_id}")
+        self.counts[";".join(stack)] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.counts.most_common())
+
+
+async def profile_cpu(duration: float, interval: float = 0.005,
+                      session_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Sample the event loop thread's stack for a time window.
+
+    Args:
+        duration: Length of the window in seconds
+        interval: Seconds between samples
+        session_id: Only keep samples attributed to this session
+
+    Returns:
+        Dictionary with sample counts and collapsed stacks
+    """
+    if _profile_lock.locked():
+        raise ProfilerBusyError("A profiling window is already open in this process")
+
+    async with _profile_lock:
+        sampler = StackSampler(threading.get_ident(), interval, session_id)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "pid": os.getpid(),
+        "kind": "cpu",
+        "session_id": session_id,
+        "duration": elapsed,
+        "interval": interval,
+        "samples": sampler.samples,
+        "matched_samples": sum(sampler.counts.values()),
+        "collapsed": sampler.collapsed(),
+    }
+
+
+def _snapshot_and_collapse(limit: int, stop: bool) -> Dict[str, Any]:
+    """Take a tracemalloc snapshot and collapse it. Runs in a worker thread."""
+    snapshot = tracemalloc.take_snapshot()
+    nframes = tracemalloc.get_traceback_limit()
+    if stop:
+        # Stop tracing before the (slow) aggregation so other sessions stop paying for it
+        tracemalloc.stop()
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+    stats = snapshot.statistics("traceback")
+
+    lines = []
+    for stat in stats[:limit]:
+        # Traceback frames are ordered oldest first, which is what collapsed stacks expect.
+        # tracemalloc doesn't record function names, so frames are labelled path:line.
+        stack = ";".join(f"{_short_path(f.filename)}:{f.lineno}" for f in stat.traceback)
+        lines.append(f"{stack} {stat.size}")
+
+    return {
+        # Depth actually recorded; differs from the request if tracemalloc was already running
+        "nframes": nframes,
+        "total_bytes": sum(stat.size for stat in stats),
+        "total_blocks": sum(stat.count for stat in stats),
+        "collapsed": "\n".join(lines),
+    }
+
+
+async def profile_memory(duration: float, nframes: int = 25, limit: int = 500) -> Dict[str, Any]:
+    """
+    Trace allocations for a time window and snapshot what is still allocated.
+
+    If tracemalloc was already running it is left running with its existing
+    depth, so nframes has no effect; the depth used is returned as "nframes".
+    Otherwise it is started for the window and stopped afterwards.
+
+    Args:
+        duration: Length of the window in seconds
+        nframes: Stack depth recorded per allocation
+        limit: Maximum number of stacks to return (largest first)
+
+    Returns:
+        Dictionary with allocation totals and collapsed stacks weighted by bytes
+    """
+    if _profile_lock.locked():
+        raise ProfilerBusyError("A profiling window is already open in this process")
+
+    async with _profile_lock:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(nframes)
+        start = time.perf_counter()
+        try:
+            await asyncio.sleep(duration)
+            elapsed = time.perf_counter() - start
+            result = await asyncio.to_thread(_snapshot_and_collapse, limit, started)
+        finally:
+            if started and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    result.update({
+        "pid": os.getpid(),
+        "kind": "memory",
+        "duration": elapsed,
+        "requested_nframes": nframes,
+        "tracemalloc_already_running": not started,
+    })
+    return result
@@ -0,0 +1,160 @@
+# --- Replay Service ---
+# Feeds recorded session event logs back through NxtWaveOnboardingAgent,
+# as fast as the agent can process them, and compares what the agent sends now
+# against what it sent during the live session. Sessions are replayed in parallel
+# across a process pool so changes to intents, retrieval or caching can be
+# checked for correctness and speed against real traffic.
+#
+# Usage (from /backend):
+#   python -m app.services.replay_service session_logs/*.sessionlog
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+from app.services.session_log import (
+    SessionEventLog,
+    read_session_log,
+    FRONTEND_ACTION,
+    USER_UTTERANCE,
+    EVENT_KIND_NAMES,
+)
+
+INBOUND_KINDS = (FRONTEND_ACTION, USER_UTTERANCE)
+
+
+def _group_by_inbound(records: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Split a record stream into inbound events, each with the outputs it produced.
+
+    Outputs recorded before the first inbound event (e.g. the welcome message
+    sent on join) belong to session setup and are not replayed.
+    """
+    steps = []
+    for kind, timestamp, payload in records:
+        if kind in INBOUND_KINDS:
+            steps.append({"kind": kind, "timestamp": timestamp, "payload": payload, "outputs": []})
+        elif steps:
+            steps[-1]["outputs"].append([EVENT_KIND_NAMES[kind], payload])
+    return steps
+
+
+async def replay_session(path: str) -> Dict[str, Any]:
+    """
+    Replay one recorded session through a fresh agent.
+
+    Args:
+        path: Path to a session event log
+
+    Returns:
+        Dictionary with mismatches and timing for the session
+    """
+    # Imported here so worker processes only pay for it when they replay
+    from app.agents.onboarding_agent import NxtWaveOnboardingAgent
+
+    read_errors = []
+    records = list(read_session_log(path, read_errors))
+    steps = _group_by_inbound(records)
+
+    agent = NxtWaveOnboardingAgent()
+    agent.event_log = SessionEventLog(None)
+
+    mismatches = []
+    start = time.perf_counter()
+    for index, step in enumerate(steps):
+        agent.event_log.records.clear()
+
+        if step["kind"] == FRONTEND_ACTION:
+            await agent.handle_frontend_message(step["payload"])
+        else:
+            await agent.on_user_speech_completed(step["payload"])
+
+        # Drop the inbound record the agent logs for itself
+        actual = [
+            [EVENT_KIND_NAMES[kind], payload]
+            for kind, _, payload in agent.event_log.records
+            if kind not in INBOUND_KINDS
+        ]
+        if actual != step["outputs"]:
+            mismatches.append({
+                "index": index,
+                "input": step["payload"],
+                "expected": step["outputs"],
+                "actual": actual,
+            })
+    replay_seconds = time.perf_counter() - start
+
+    # Measured from the first inbound event: setup output before it isn't replayed
+    recorded_seconds = records[-1][1] - steps[0]["timestamp"] if steps else 0.0
+    return {
+        "path": path,
+        "records": len(records),
+        "events": len(steps),
+        # Set when the log was damaged; records up to that point were still replayed
+        "read_error": read_errors[0] if read_errors else None,
+        "passed": not mismatches,
+        "mismatches": mismatches,
+        "replay_seconds": replay_seconds,
+        "recorded_seconds": recorded_seconds,
+        "speedup": recorded_seconds / replay_seconds if replay_seconds > 0 else None,
+    }
+
+
+def _replay_worker(path: str) -> Dict[str, Any]:
+    """Process-pool entry point: replay a single session in its own event loop."""
+    try:
+        return asyncio.run(replay_session(path))
+    except Exception as e:
+        return {"path": path, "passed": False, "error": str(e)}
+
+
+def replay_sessions(paths: List[str], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Replay many recorded sessions in parallel across a process pool.
+
+    Args:
+        paths: Session event log paths
+        max_workers: Pool size (defaults to the number of CPUs)
+
+    Returns:
+        One result dictionary per path, in the same order
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_replay_worker, paths))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded agent sessions")
+    parser.add_argument("paths", nargs="+", help="Session event log files")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = replay_sessions(args.paths, args.workers)
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for result in results:
+        if "error" in result:
+            failed += 1
+            print(f"ERROR {result['path']}: {result['error']}")
+        elif not result["passed"]:
+            failed += 1
+            print(f"FAIL  {result['path']}: {len(result['mismatches'])} of {result['events']} events differ")
+            for mismatch in result["mismatches"]:
+                print(f"      #{mismatch['index']} input={mismatch['input']!r}")
+                print(f"        expected={mismatch['expected']}")
+                print(f"        actual=  {mismatch['actual']}")
+        else:
+            speedup = f"{result['speedup']:.2f}x" if result["speedup"] else "n/a"
+            print(f"OK    {result['path']}: {result['events']} events, {speedup} real time")
+        if result.get("read_error"):
+            print(f"      log read stopped early: {result['read_error']}")
+
+    print(f"Replayed {len(results)} sessions in {elapsed:.2f}s, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
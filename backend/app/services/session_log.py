@@ -0,0 +1,229 @@
+# --- Session Event Log ---
+# Append-only binary log of everything that happens in an agent session:
+# inbound frontend actions, user utterances, stage changes and outbound payloads.
+# Records are buffered in memory and written to disk in a worker thread so the
+# event loop never blocks on file I/O. The replay service reads these files back.
+import asyncio
+import json
+import os
+import struct
+import time
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# File header: magic + format version
+LOG_MAGIC = b"NWSL"
+LOG_VERSION = 1
+_HEADER = struct.Struct("<4sH")
+
+# Record header: kind (uint8), wall-clock timestamp (float64), payload length (uint32)
+_RECORD = struct.Struct("<BdI")
+
+# Record kinds
+FRONTEND_ACTION = 1
+USER_UTTERANCE = 2
+STAGE_CHANGE = 3
+OUTBOUND = 4
+
+EVENT_KIND_NAMES = {
+    FRONTEND_ACTION: "frontend_action",
+    USER_UTTERANCE: "user_utterance",
+    STAGE_CHANGE: "stage_change",
+    OUTBOUND: "outbound",
+}
+
+# Flush once this many bytes are buffered, or this many seconds have passed
+DEFAULT_FLUSH_BYTES = 64 * 1024
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Records kept in memory while writes are failing before they are dropped
+MAX_BUFFER_BYTES = 1024 * 1024
+
+
+def _encode_payload(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def encode_record(kind: int, payload: Any, timestamp: Optional[float] = None) -> bytes:
+    """
+    Encode a single log record.
+
+    Args:
+        kind: One of the record kind constants
+        payload: JSON-serialisable payload
+        timestamp: Wall-clock time of the event (defaults to now)
+
+    Returns:
+        The framed record bytes
+    """
+    body = _encode_payload(payload)
+    if timestamp is None:
+        timestamp = time.time()
+    return _RECORD.pack(kind, timestamp, len(body)) + body
+
+
+class SessionEventLog:
+    """Buffered, append-only event log for a single agent session."""
+
+    def __init__(self, path: Optional[str], flush_bytes: int = DEFAULT_FLUSH_BYTES,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        # A path of None keeps records in memory only (used by replay).
+        # The file itself is created by the first write, in a worker thread.
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.records = [] if path is None else None
+        self.dropped_bytes = 0
+        self._buffer = bytearray()
+        self._flush_lock = asyncio.Lock()
+        self._pending: Optional[asyncio.Task] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self._header_written = False
+        self._closed = False
+
+    def record(self, kind: int, payload: Any):
+        """Append a record. Never blocks or raises; disk writes happen off the event loop."""
+        if self._closed:
+            return
+
+        try:
+            if self.records is not None:
+                # Round-trip through JSON so replayed payloads compare like recorded ones
+                self.records.append((kind, time.time(), json.loads(_encode_payload(payload))))
+                return
+            self._buffer += encode_record(kind, payload)
+        except Exception as e:
+            print(f"Error recording {EVENT_KIND_NAMES.get(kind, kind)} event: {e}")
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No running loop (e.g. called from sync code); flush on close
+            return
+
+        # Flush periodically so a crashed worker loses at most one interval of records
+        if self._ticker is None:
+            self._ticker = loop.create_task(self._flush_periodically())
+        if len(self._buffer) >= self.flush_bytes and self._pending is None:
+            self._pending = loop.create_task(self.flush())
+
+    def frontend_action(self, message: str):
+        if isinstance(message, (bytes, bytearray)):
+            message = message.decode("utf-8", errors="replace")
+        self.record(FRONTEND_ACTION, message)
+
+    def user_utterance(self, text: str):
+        self.record(USER_UTTERANCE, text)
+
+    def stage_change(self, stage: int):
+        self.record(STAGE_CHANGE, stage)
+
+    def outbound(self, payload: Dict[str, Any]):
+        self.record(OUTBOUND, payload)
+
+    async def _flush_periodically(self):
+        while not self._closed:
+            await asyncio.sleep(self.flush_interval)
+            # Shielded so close() cancelling the ticker can't interrupt a write
+            await asyncio.shield(self.flush())
+
+    async def flush(self):
+        """Write buffered records to disk in a worker thread."""
+        async with self._flush_lock:
+            self._pending = None
+            if not self._buffer or self.path is None:
+                return
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            try:
+                await asyncio.to_thread(self._write, data)
+            except Exception as e:
+                print(f"Error writing session log {self.path}: {e}")
+                # Keep the records for the next attempt, up to a bound
+                if len(data) + len(self._buffer) <= MAX_BUFFER_BYTES:
+                    self._buffer[:0] = data
+                else:
+                    self.dropped_bytes += len(data)
+                    print(f"Dropped {len(data)} bytes from session log {self.path}")
+
+    def _write(self, data: bytes):
+        if not self._header_written:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # Unbuffered so a failed write can't be retried behind our back on close
+        with open(self.path, "ab", buffering=0) as f:
+            start = f.seek(0, os.SEEK_END)
+            if start == 0:
+                data = _HEADER.pack(LOG_MAGIC, LOG_VERSION) + data
+            try:
+                view = memoryview(data)
+                while view:
+                    written = f.write(view)
+                    view = view[written:]
+            except BaseException:
+                # Drop any partial record (or header) so the retry starts on a clean boundary
+                f.truncate(start)
+                raise
+        self._header_written = True
+
+    async def close(self):
+        """Flush remaining records and stop accepting new ones."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+        await self.flush()
+
+
+def _read_error(path: str, errors: Optional[List[str]], message: str):
+    print(f"Session log {path}: {message}")
+    if errors is not None:
+        errors.append(message)
+
+
+def read_session_log(path: str, errors: Optional[List[str]] = None) -> Iterator[Tuple[int, float, Any]]:
+    """
+    Read records from a session log file.
+
+    Args:
+        path: Path to the log file
+        errors: If given, receives a message describing where reading stopped early
+
+    Yields:
+        (kind, timestamp, payload) tuples in the order they were written
+
+    Reading stops at the first record that can't be decoded; every record
+    before it is still yielded.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if len(data) < _HEADER.size:
+        return
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != LOG_MAGIC or version != LOG_VERSION:
+        raise ValueError(f"Not a session log (or unsupported version): {path}")
+
+    offset = _HEADER.size
+    end = len(data)
+    count = 0
+    while offset + _RECORD.size <= end:
+        kind, timestamp, length = _RECORD.unpack_from(data, offset)
+        body_start = offset + _RECORD.size
+        if body_start + length > end:
+            # Truncated tail from an interrupted write; ignore it
+            _read_error(path, errors, f"truncated record at byte {offset}, read {count} records")
+            return
+        try:
+            if kind not in EVENT_KIND_NAMES:
+                raise ValueError(f"unknown record kind {kind}")
+            payload = json.loads(data[body_start:body_start + length])
+        except ValueError as e:
+            # JSONDecodeError and UnicodeDecodeError are both ValueErrors
+            _read_error(path, errors, f"corrupt record at byte {offset} ({e}), read {count} records")
+            return
+        offset = body_start + length
+        count += 1
+        yield kind, timestamp, payload